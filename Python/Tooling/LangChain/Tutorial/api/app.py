@@ -1,44 +1,97 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from langchain.prompts import ChatPromptTemplate
-from langchain_google_genai.chat_models import ChatGoogleGenerativeAI
 from langserve import add_routes
 from dotenv import load_dotenv
+from pathlib import Path
 import uvicorn
 import os
+import sys
 
-load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from semantic_cache import CachedChain, cache_from_env
+from bulk import BulkRequest, limit, ndjson, run_bulk
+from metrics import StageTimer, TimingMiddleware, render_metrics
 
-os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
+load_dotenv()
 
-app = FastAPI(
-    title="LangChain Server",
-    version="1.0",
-    description="A simple API Server"
-)
 
 # ---- Model (MODEL IS REQUIRED) ----
-model = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.7
-)
-
-# ---- Raw chat endpoint ----
-add_routes(
-    app,
-    model,
-    path="/chat"
-)
-
-# ---- Prompted chain endpoint ----
-prompt = ChatPromptTemplate.from_template(
-    "Write me an essay about {topic} with 100 words"
-)
-
-add_routes(
-    app,
-    prompt | model,
-    path="/essay"
-)
+# FAKE_LLM=1 serves a local fake model so the app runs with no network or API key
+def get_model():
+    if os.getenv("FAKE_LLM"):
+        from fake_llm import FakeEssayModel
+        return FakeEssayModel(
+            first_token_delay=float(os.getenv("FAKE_LLM_FIRST_TOKEN_DELAY", 0.3)),
+            token_delay=float(os.getenv("FAKE_LLM_TOKEN_DELAY", 0.02))
+        )
+
+    from langchain_google_genai.chat_models import ChatGoogleGenerativeAI
+    os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        temperature=0.7
+    )
+
+
+# ---- Response cache (see semantic_cache.cache_from_env for settings) ----
+def gemini_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+
+
+def create_app(model, cache=None):
+    app = FastAPI(
+        title="LangChain Server",
+        version="1.0",
+        description="A simple API Server"
+    )
+
+    # ---- Raw chat endpoint ----
+    add_routes(
+        app,
+        model,
+        path="/chat"
+    )
+
+    # ---- Prompted chain endpoint ----
+    prompt = ChatPromptTemplate.from_template(
+        "Write me an essay about {topic} with 100 words"
+    )
+
+    essay_chain = CachedChain(prompt, model, cache) if cache else prompt | model
+    # StageTimer records prompt-formatting and model-call time for each request
+    essay_chain = essay_chain.with_config(callbacks=[StageTimer()])
+
+    # /essay/stream sends tokens as server-sent events while the model is still generating
+    add_routes(
+        app,
+        essay_chain,
+        path="/essay"
+    )
+
+    # ---- Bulk essays: NDJSON lines streamed back in completion order ----
+    @app.post("/essay/bulk")
+    async def essay_bulk(request: BulkRequest):
+        results = run_bulk(essay_chain, request.topics, limit(request.max_concurrency))
+        return StreamingResponse(ndjson(results), media_type="application/x-ndjson")
+
+    # ---- Latency metrics (Prometheus text format) ----
+    app.add_middleware(TimingMiddleware)
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+    if cache:
+        @app.get("/cache/stats")
+        def cache_stats():
+            return cache.stats()
+
+    return app
+
+
+app = create_app(get_model(), cache_from_env(None if os.getenv("FAKE_LLM") else gemini_embeddings))
 
 if __name__ == "__main__":
     uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
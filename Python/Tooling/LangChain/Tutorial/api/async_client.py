@@ -0,0 +1,44 @@
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+ESSAY_URL = "http://localhost:8000/essay"
+
+
+# ---- one pooled keep-alive connection set for every request this client makes ----
+class EssayClient:
+    def __init__(self, url: str = ESSAY_URL, max_connections: int = 16, timeout: float = 300):
+        self.client = httpx.AsyncClient(
+            base_url=url,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout
+        )
+
+    async def essay(self, topic: str) -> str:
+        response = await self.client.post("/invoke", json={"input": {"topic": topic}})
+        response.raise_for_status()
+        return response.json()["output"]["content"]
+
+    async def essays(self, topics: List[str]) -> List[str]:
+        # one /invoke per topic, concurrently over the shared pool
+        return await asyncio.gather(*(self.essay(t) for t in topics))
+
+    async def bulk(self, topics: List[str], max_concurrency: Optional[int] = None) -> AsyncIterator[dict]:
+        # single /bulk request; results arrive as NDJSON lines in completion order
+        payload = {"topics": topics, "max_concurrency": max_concurrency}
+        async with self.client.stream("POST", "/bulk", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    yield json.loads(line)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
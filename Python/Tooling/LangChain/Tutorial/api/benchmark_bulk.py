@@ -0,0 +1,57 @@
+"""Offline essay generation: one request per topic vs. pooled async client vs. /essay/bulk.
+
+Runs against the fake local model, so no network or API key is needed.
+
+    cd api && python benchmark_bulk.py --topics 40 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ["FAKE_LLM"] = "1"
+os.environ.setdefault("FAKE_LLM_FIRST_TOKEN_DELAY", "0.2")
+os.environ.setdefault("FAKE_LLM_TOKEN_DELAY", "0.005")
+
+from async_client import EssayClient
+from benchmark_ttft import start_server
+from client import get_gemini_response
+
+
+async def run(url, topics, concurrency):
+    # every mode gets its own topics so the response cache can't serve one mode from another
+    start = time.perf_counter()
+    for topic in topics:
+        get_gemini_response(f"sequential {topic}", url)
+    print(f"sequential, new connection each: {time.perf_counter() - start:6.2f}s")
+
+    async with EssayClient(url, max_connections=concurrency) as client:
+        start = time.perf_counter()
+        await client.essays([f"pooled {t}" for t in topics])
+        print(f"async client, {concurrency} pooled connections: {time.perf_counter() - start:6.2f}s")
+
+        start, first = time.perf_counter(), None
+        async for result in client.bulk([f"bulk {t}" for t in topics], concurrency):
+            first = first or time.perf_counter() - start
+            if "error" in result:
+                print("error:", result)
+        print(f"/essay/bulk, max_concurrency={concurrency}: {time.perf_counter() - start:6.2f}s "
+              f"(first result after {first:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    os.environ["BULK_MAX_CONCURRENCY"] = str(args.concurrency)
+    server = start_server(args.port)
+    topics = [f"topic {i}" for i in range(args.topics)]
+    asyncio.run(run(f"http://127.0.0.1:{args.port}/essay", topics, args.concurrency))
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
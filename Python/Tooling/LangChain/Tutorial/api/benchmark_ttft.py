@@ -0,0 +1,57 @@
+"""Time-to-first-token of /essay/stream vs. waiting on /essay/invoke, against the fake model.
+
+    cd api && python benchmark_ttft.py --requests 5
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+os.environ["FAKE_LLM"] = "1"
+
+import uvicorn
+
+from client import get_gemini_response, stream_gemini_response
+
+
+def start_server(port):
+    server = uvicorn.Server(uvicorn.Config("app:app", host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("uvicorn failed to start")
+        time.sleep(0.05)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    url = f"http://127.0.0.1:{args.port}/essay"
+
+    invoke, ttft, stream_total = [], [], []
+    for i in range(args.requests):
+        start = time.perf_counter()
+        get_gemini_response(f"topic {i}", url)
+        invoke.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for n, _ in enumerate(stream_gemini_response(f"streamed topic {i}", url)):
+            if n == 0:
+                ttft.append(time.perf_counter() - start)
+        stream_total.append(time.perf_counter() - start)
+
+    print(f"invoke: first text after {statistics.median(invoke) * 1000:.0f} ms (median)")
+    print(f"stream: first token after {statistics.median(ttft) * 1000:.0f} ms, "
+          f"complete after {statistics.median(stream_total) * 1000:.0f} ms (median)")
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator, List, Optional
+
+from pydantic import BaseModel
+
+# ---- upper bound on model calls one bulk request may have in flight ----
+MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", 8))
+
+
+class BulkRequest(BaseModel):
+    topics: List[str]
+    max_concurrency: Optional[int] = None
+
+
+async def run_bulk(chain, topics: List[str], max_concurrency: int) -> AsyncIterator[dict]:
+    # chain.abatch only returns once every input is done, and abatch_as_completed in the pinned
+    # langchain-core ignores max_concurrency, so bound ainvoke calls ourselves and yield in completion order
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(index: int, topic: str) -> dict:
+        async with semaphore:
+            try:
+                output = await chain.ainvoke({"topic": topic})
+            except Exception as e:
+                return {"index": index, "topic": topic, "error": repr(e)}
+        return {"index": index, "topic": topic, "output": getattr(output, "content", output)}
+
+    tasks = [asyncio.ensure_future(run_one(i, t)) for i, t in enumerate(topics)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # client went away mid-stream: stop generating essays nobody will read
+        for task in tasks:
+            task.cancel()
+
+
+async def ndjson(results: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for result in results:
+        yield (json.dumps(result) + "\n").encode()
+
+
+def limit(requested: Optional[int]) -> int:
+    return max(1, min(requested or MAX_CONCURRENCY, MAX_CONCURRENCY))
@@ -1,15 +1,58 @@
+import json
 import requests
 import streamlit as st
 
-def get_gemini_response(input_text):
+ESSAY_URL = "http://localhost:8000/essay"
+
+def get_gemini_response(input_text, url=ESSAY_URL):
   response = requests.post(
-    "http://localhost:8000/essay/invoke",
+    f"{url}/invoke",
     json={"input": {"topic": input_text}})
 
   return response.json()['output']['content']
 
-st.title("Lanchain Demo with Google Gemini")
-input_text = st.text_input("Write an essay on")
+def iter_lines(response):
+  # requests' iter_lines yields a spurious empty line when a \r\n is split between two chunks,
+  # which would end an event early; split on \n ourselves and drop the \r
+  # chunk_size=None hands data over as soon as it arrives instead of buffering 512 bytes
+  pending = b""
+  for chunk in response.iter_content(chunk_size=None):
+    lines = (pending + chunk).split(b"\n")
+    pending = lines.pop()
+    for line in lines:
+      yield line.rstrip(b"\r").decode("utf-8")
+  if pending:
+    yield pending.rstrip(b"\r").decode("utf-8")
+
+def iter_sse(response):
+  # yields (event, data) pairs from a langserve server-sent-event stream
+  event, data = None, []
+  for line in iter_lines(response):
+    if line.startswith("event:"):
+      event = line[len("event:"):].strip()
+    elif line.startswith("data:"):
+      data.append(line[len("data:"):].strip())
+    elif not line and event:
+      yield event, json.loads("\n".join(data)) if data else None
+      event, data = None, []
+
+def stream_gemini_response(input_text, url=ESSAY_URL):
+  with requests.post(
+    f"{url}/stream",
+    json={"input": {"topic": input_text}},
+    stream=True) as response:
+    response.raise_for_status()
+    for event, data in iter_sse(response):
+      if event == "data":
+        yield data["content"]
+      elif event == "error":
+        raise RuntimeError(data)
+      elif event == "end":
+        return
+
+if __name__ == "__main__":
+  st.title("Lanchain Demo with Google Gemini")
+  input_text = st.text_input("Write an essay on")
 
-if input_text:
-  st.write(get_gemini_response(input_text))
+  if input_text:
+    st.write_stream(stream_gemini_response(input_text))
@@ -0,0 +1,45 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+# ---- Offline stand-in for Gemini: streams a canned reply word by word with model-like latency ----
+class FakeEssayModel(BaseChatModel):
+    first_token_delay: float = 0.3
+    token_delay: float = 0.02
+    words: int = 100
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-essay"
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = str(messages[-1].content)
+        base = prompt.split()
+        return [f"{base[i % len(base)] if base else 'word'} " for i in range(self.words)]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.first_token_delay + self.token_delay * self.words)
+        text = "".join(self._tokens(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.first_token_delay + self.token_delay * self.words)
+        text = "".join(self._tokens(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_delay)
+        for token in self._tokens(messages):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            time.sleep(self.token_delay)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_delay)
+        for token in self._tokens(messages):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            await asyncio.sleep(self.token_delay)
@@ -0,0 +1,87 @@
+"""Open-loop asyncio load generator for the essay API.
+
+Requests are launched on a fixed schedule (--rps) whether or not earlier ones have
+finished, so queueing inside the server shows up in the latency percentiles.
+
+    cd api && python loadtest.py --spawn --rps 20 --duration 30           # in-process app, stubbed model
+    cd api && python loadtest.py --url http://127.0.0.1:8000 --rps 5      # an already running server
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def fire(client, path, topic, latencies, errors):
+    start = time.perf_counter()
+    try:
+        response = await client.post(f"/essay{path}", json={"input": {"topic": topic}})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    except httpx.HTTPError as e:
+        errors.append(repr(e))
+
+
+async def run(url, path, rps, duration, distinct_topics):
+    latencies, errors, tasks = [], [], []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        start = time.perf_counter()
+        for i in range(int(rps * duration)):
+            # sleep until this request's slot rather than a fixed interval, so scheduling drift doesn't accumulate
+            await asyncio.sleep(max(0.0, start + i / rps - time.perf_counter()))
+            topic = f"topic {i % distinct_topics if distinct_topics else i}"
+            tasks.append(asyncio.create_task(fire(client, path, topic, latencies, errors)))
+        sent_for = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        print(f"sent {len(tasks)} requests in {sent_for:.1f}s (target {rps} rps), all done after {elapsed:.1f}s")
+        print(f"completed {len(latencies)}, errors {len(errors)}")
+        if latencies:
+            print("latency ms: " + "  ".join(
+                f"p{p}={percentile(latencies, p) * 1000:.0f}" for p in (50, 95, 99)
+            ) + f"  mean={statistics.mean(latencies) * 1000:.0f}")
+        if errors:
+            print("first error:", errors[0])
+
+        metrics = await client.get("/metrics")
+        if metrics.status_code == 200:
+            print("\nserver-side time per stage (seconds, summed over requests):")
+            for line in metrics.text.splitlines():
+                if line.startswith("chain_stage_duration_seconds_sum") and f'route="/essay{path}"' in line:
+                    print(" ", line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8767", help="server root")
+    parser.add_argument("--path", default="/invoke", help="essay endpoint to hit")
+    parser.add_argument("--rps", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=10, help="seconds to keep sending")
+    parser.add_argument("--distinct-topics", type=int, default=0,
+                        help="cycle through this many topics so the response cache gets hits (0: all distinct)")
+    parser.add_argument("--spawn", action="store_true", help="start the app in-process with the fake model")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        os.environ["FAKE_LLM"] = "1"
+        from benchmark_ttft import start_server
+        server = start_server(int(args.url.rsplit(":", 1)[1]))
+
+    asyncio.run(run(args.url.rstrip("/"), args.path, args.rps, args.duration, args.distinct_topics))
+    if server:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
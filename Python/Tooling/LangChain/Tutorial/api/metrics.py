@@ -0,0 +1,161 @@
+import bisect
+import contextvars
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# ---- latency buckets (seconds) shared by every histogram ----
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# the request being served: its ASGI scope, and when its last chain stage ended
+current_request: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("current_request", default=None)
+
+
+def route_label(scope) -> str:
+    # the matched route's template rather than the raw path, so path parameters and 404s don't add series;
+    # the router puts it in the scope before calling the endpoint
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series: Dict[tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self.lock:
+            series = self.series.setdefault(label_values, [0] * len(self.buckets) + [0.0, 0])
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for label_values, series in sorted(self.series.items()):
+                labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+                lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+                lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Time from request start to last body byte.",
+                            ("route", "method", "status"))
+FIRST_BYTE_SECONDS = Histogram("http_first_byte_seconds", "Time from request start to first body byte.",
+                               ("route", "method"))
+STAGE_SECONDS = Histogram("chain_stage_duration_seconds",
+                          "Per-stage time: prompt formatting, model call, model first token, and serialization "
+                          "(last stage end to first body byte, for responses sent after the chain finished).",
+                          ("route", "stage"))
+
+
+def render_metrics() -> str:
+    return "".join(h.render() for h in (REQUEST_SECONDS, FIRST_BYTE_SECONDS, STAGE_SECONDS))
+
+
+# ---- chain stages, timed from langchain callbacks ----
+class StageTimer(BaseCallbackHandler):
+    run_inline = True  # cheap bookkeeping; don't hop to an executor thread per event
+
+    def __init__(self):
+        self.started: Dict[UUID, Tuple[str, float]] = {}
+        self.first_token: set = set()
+
+    def _start(self, run_id: UUID, stage: str) -> None:
+        self.started[run_id] = (stage, time.perf_counter())
+
+    def _end(self, run_id: UUID) -> None:
+        started = self.started.pop(run_id, None)
+        self.first_token.discard(run_id)
+        if started is None:
+            return
+        stage, start = started
+        self._record(stage, time.perf_counter() - start)
+
+    @staticmethod
+    def _record(stage: str, seconds: float) -> None:
+        request = current_request.get()
+        STAGE_SECONDS.observe(seconds, route_label(request["scope"]) if request else "none", stage)
+        if request is not None and stage != "model_first_token":
+            request["stages_end"] = time.perf_counter()
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, run_type: Optional[str] = None, **kwargs: Any):
+        if run_type == "prompt":
+            self._start(run_id, "prompt")
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, "model")
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, "model")
+
+    def on_llm_new_token(self, token, *, run_id: UUID, **kwargs: Any):
+        if run_id in self.started and run_id not in self.first_token:
+            self.first_token.add(run_id)
+            self._record("model_first_token", time.perf_counter() - self.started[run_id][1])
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
+
+
+# ---- whole requests, timed by a pure ASGI middleware so streamed bodies are measured to the end ----
+class TimingMiddleware:
+    def __init__(self, app, skip=("/metrics",)):
+        self.app = app
+        self.skip = skip
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip:
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        start = time.perf_counter()
+        status = {"code": 500, "first_byte": None}
+        request = {"scope": scope, "stages_end": None}
+        request_token = current_request.set(request)
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body" and status["first_byte"] is None:
+                status["first_byte"] = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            total = time.perf_counter() - start
+            route = route_label(scope)
+            REQUEST_SECONDS.observe(total, route, method, str(status["code"]))
+            if status["first_byte"] is not None:
+                FIRST_BYTE_SECONDS.observe(status["first_byte"], route, method)
+                # timed directly, so overlapping stages (batch, bulk) don't hide it; a response streamed
+                # while the chain was still running has no serialization step of its own
+                serialization = start + status["first_byte"] - (request["stages_end"] or float("inf"))
+                if serialization >= 0:
+                    STAGE_SECONDS.observe(serialization, route, "serialization")
+            current_request.reset(request_token)
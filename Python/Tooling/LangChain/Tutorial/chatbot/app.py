@@ -1,5 +1,7 @@
 import os
+import sys
 import asyncio
+from pathlib import Path
 import streamlit as st
 from dotenv import load_dotenv
 
@@ -7,6 +9,9 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from semantic_cache import CachedChain, cache_from_env
+
 
 # ---- event loop fix (required for grpc + streamlit) ----
 try:
@@ -46,12 +51,30 @@ def get_llm():
     )
 
 
+# ---- response cache, shared by every session of this server ----
+def gemini_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+
+
+@st.cache_resource
+def get_cache():
+    return cache_from_env(gemini_embeddings)
+
+
 # ---- streamlit UI ----
 st.title("LangChain Demo with Gemini API")
 input_text = st.text_input("Search the topic you want")
 
 if input_text:
     llm = get_llm()
-    chain = prompt | llm | StrOutputParser()
+    cache = get_cache()
+    chain = CachedChain(prompt, llm, cache) | StrOutputParser()
     result = chain.invoke({"question": input_text})
     st.write(result)
+
+    stats = cache.stats()
+    st.caption(
+        f"cache hit rate {stats['hit_rate']:.0%} over {stats['lookups']} questions, "
+        f"{stats['saved_seconds']:.1f}s of model time saved"
+    )
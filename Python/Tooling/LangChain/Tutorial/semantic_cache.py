@@ -0,0 +1,248 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator, Optional
+
+import numpy as np
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import patch_config
+
+
+# ---- normalization: case, whitespace and trailing punctuation don't change the answer ----
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(" ?!.")
+
+
+@dataclass
+class Entry:
+    llm_string: str
+    value: Any
+    latency: float
+    expires: float
+    vector: Optional[np.ndarray] = None
+
+
+class SemanticCache:
+    """LRU + TTL cache of model replies keyed on (normalized prompt, model parameters).
+
+    With `embeddings` set, a miss on the exact key falls back to the most similar cached
+    prompt for the same model parameters, if its cosine similarity is >= `threshold`.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600, embeddings=None, threshold=0.95):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.entries: "OrderedDict[tuple, Entry]" = OrderedDict()  # least recently used first
+        self.expiry: "OrderedDict[tuple, float]" = OrderedDict()  # soonest to expire first (the ttl is fixed)
+        self.lock = threading.Lock()
+        self.counts = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+        self.saved_seconds = 0.0
+
+    def embed(self, prompt: str) -> Optional[np.ndarray]:
+        if self.embeddings is None:
+            return None
+        return self._unit(self.embeddings.embed_query(normalize(prompt)))
+
+    async def aembed(self, prompt: str) -> Optional[np.ndarray]:
+        if self.embeddings is None:
+            return None
+        return self._unit(await self.embeddings.aembed_query(normalize(prompt)))
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype="float32")
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, prompt: str, llm_string: str, vector: Optional[np.ndarray] = None):
+        key = (normalize(prompt), llm_string)
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            kind = "exact_hits"
+            if key not in self.entries and vector is not None:
+                key = self._most_similar(llm_string, vector)
+                kind = "semantic_hits"
+            if key not in self.entries:
+                self.counts["misses"] += 1
+                return None
+            entry = self.entries[key]
+            self.entries.move_to_end(key)
+            self.counts[kind] += 1
+            self.saved_seconds += entry.latency
+            return entry.value
+
+    def update(self, prompt: str, llm_string: str, value: Any, latency: float,
+               vector: Optional[np.ndarray] = None) -> None:
+        key = (normalize(prompt), llm_string)
+        with self.lock:
+            expires = time.monotonic() + self.ttl
+            self.entries[key] = Entry(llm_string, value, latency, expires, vector)
+            self.entries.move_to_end(key)
+            self.expiry.pop(key, None)
+            self.expiry[key] = expires
+            while len(self.entries) > self.max_size:
+                del self.expiry[self.entries.popitem(last=False)[0]]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.expiry.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = sum(self.counts.values())
+            hits = self.counts["exact_hits"] + self.counts["semantic_hits"]
+            return {
+                **self.counts,
+                "lookups": lookups,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "entries": len(self.entries),
+            }
+
+    def _expire(self, now: float) -> None:
+        # only the expired entries are visited
+        while self.expiry and next(iter(self.expiry.values())) <= now:
+            del self.entries[self.expiry.popitem(last=False)[0]]
+
+    def _most_similar(self, llm_string: str, vector: np.ndarray) -> Optional[tuple]:
+        best, best_score = None, self.threshold
+        for key, entry in self.entries.items():
+            if entry.vector is None or entry.llm_string != llm_string:
+                continue
+            score = float(entry.vector @ vector)
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+
+# ---- CACHE_SIZE / CACHE_TTL size the cache; SEMANTIC_CACHE_THRESHOLD turns on embedding matches ----
+def cache_from_env(make_embeddings=None) -> SemanticCache:
+    threshold = os.getenv("SEMANTIC_CACHE_THRESHOLD")
+    return SemanticCache(
+        max_size=int(os.getenv("CACHE_SIZE", 1024)),
+        ttl=float(os.getenv("CACHE_TTL", 3600)),
+        embeddings=make_embeddings() if threshold and make_embeddings else None,
+        threshold=float(threshold or 0.95),
+    )
+
+
+class CachedChain(Runnable):
+    """`prompt | llm` with replies served from a SemanticCache when possible.
+
+    Supports invoke/stream (and their async forms); a cache hit is streamed as one chunk.
+    The prompt and the model run as child runs of the chain, so callbacks and traces see both.
+    """
+
+    def __init__(self, prompt: Runnable, llm, cache: SemanticCache):
+        self.prompt = prompt
+        self.llm = llm
+        self.cache = cache
+
+    @property
+    def InputType(self):
+        return self.prompt.InputType
+
+    @property
+    def OutputType(self):
+        return self.llm.OutputType
+
+    def get_input_schema(self, config: Optional[RunnableConfig] = None):
+        return self.prompt.get_input_schema(config)
+
+    def get_output_schema(self, config: Optional[RunnableConfig] = None):
+        return self.llm.get_output_schema(config)
+
+    def invoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        return self._call_with_config(self._invoke, input, config, **kwargs)
+
+    async def ainvoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        return await self._acall_with_config(self._ainvoke, input, config, **kwargs)
+
+    def stream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator:
+        yield from self._transform_stream_with_config(iter([input]), self._stream, config, **kwargs)
+
+    async def astream(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator:
+        async def inputs():
+            yield input
+
+        async for chunk in self._atransform_stream_with_config(inputs(), self._astream, config, **kwargs):
+            yield chunk
+
+    def _invoke(self, input, run_manager, config):
+        prompt_value, text, llm_string = self._prepare(input, run_manager, config)
+        vector = self.cache.embed(text)
+        hit = self.cache.lookup(text, llm_string, vector)
+        if hit is not None:
+            return hit
+        start = time.perf_counter()
+        output = self.llm.invoke(prompt_value, self._child(run_manager, config))
+        self.cache.update(text, llm_string, output, time.perf_counter() - start, vector)
+        return output
+
+    async def _ainvoke(self, input, run_manager, config):
+        prompt_value, text, llm_string = await self._aprepare(input, run_manager, config)
+        vector = await self.cache.aembed(text)
+        hit = self.cache.lookup(text, llm_string, vector)
+        if hit is not None:
+            return hit
+        start = time.perf_counter()
+        output = await self.llm.ainvoke(prompt_value, self._child(run_manager, config))
+        self.cache.update(text, llm_string, output, time.perf_counter() - start, vector)
+        return output
+
+    def _stream(self, inputs: Iterator, run_manager, config) -> Iterator:
+        for input in inputs:
+            prompt_value, text, llm_string = self._prepare(input, run_manager, config)
+            vector = self.cache.embed(text)
+            hit = self.cache.lookup(text, llm_string, vector)
+            if hit is not None:
+                yield AIMessageChunk(content=hit.content, additional_kwargs=hit.additional_kwargs)
+                continue
+            start, full = time.perf_counter(), None
+            for chunk in self.llm.stream(prompt_value, self._child(run_manager, config)):
+                full = chunk if full is None else full + chunk
+                yield chunk
+            if full is not None:
+                self.cache.update(text, llm_string, self._as_message(full), time.perf_counter() - start, vector)
+
+    async def _astream(self, inputs: AsyncIterator, run_manager, config) -> AsyncIterator:
+        async for input in inputs:
+            prompt_value, text, llm_string = await self._aprepare(input, run_manager, config)
+            vector = await self.cache.aembed(text)
+            hit = self.cache.lookup(text, llm_string, vector)
+            if hit is not None:
+                yield AIMessageChunk(content=hit.content, additional_kwargs=hit.additional_kwargs)
+                continue
+            start, full = time.perf_counter(), None
+            async for chunk in self.llm.astream(prompt_value, self._child(run_manager, config)):
+                full = chunk if full is None else full + chunk
+                yield chunk
+            if full is not None:
+                self.cache.update(text, llm_string, self._as_message(full), time.perf_counter() - start, vector)
+
+    @staticmethod
+    def _child(run_manager, config) -> RunnableConfig:
+        return patch_config(config, callbacks=run_manager.get_child())
+
+    def _prepare(self, input, run_manager, config):
+        prompt_value = self.prompt.invoke(input, self._child(run_manager, config))
+        return prompt_value, prompt_value.to_string(), self._llm_string()
+
+    async def _aprepare(self, input, run_manager, config):
+        prompt_value = await self.prompt.ainvoke(input, self._child(run_manager, config))
+        return prompt_value, prompt_value.to_string(), self._llm_string()
+
+    def _llm_string(self) -> str:
+        # the model's public parameters (model name, temperature, ...), so each configuration has its own entries
+        return json.dumps(self.llm.dict(), sort_keys=True, default=str)
+
+    @staticmethod
+    def _as_message(chunk) -> AIMessage:
+        return AIMessage(content=chunk.content, additional_kwargs=chunk.additional_kwargs)
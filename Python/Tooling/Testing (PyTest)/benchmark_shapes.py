@@ -0,0 +1,39 @@
+"""Per-shape cost of areas computed over Rectangle objects vs. one RectangleArray.
+
+    python benchmark_shapes.py --count 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import source.shapes as shapes
+import source.shape_arrays as shape_arrays
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    count = args.count
+    rng = np.random.default_rng(0)
+    lengths, widths = rng.random(count), rng.random(count)
+    objects = [shapes.Rectangle(l, w) for l, w in zip(lengths, widths)]
+    arrays = shape_arrays.RectangleArray(lengths, widths)
+
+    start = time.perf_counter()
+    object_areas = [r.area() for r in objects]
+    object_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    array_areas = arrays.area()
+    array_time = time.perf_counter() - start
+
+    assert np.array_equal(array_areas, object_areas)
+    print(f"per shape: objects {object_time / count * 1e9:.1f} ns, arrays {array_time / count * 1e9:.1f} ns "
+          f"({object_time / array_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,194 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+
 database = {1: "Alice", 2: "Bob", 3: "Charlie"}
 
+_MISSING = object()
+
 
 def get_user_from_db(user_id):
     return database.get(user_id)
+
+
+def fetch_users_from_db(user_ids):
+    # Stand-in for one batched round trip, e.g. SELECT ... WHERE id IN (...)
+    return {user_id: database.get(user_id) for user_id in user_ids}
+
+
+class _LoopState:
+    def __init__(self):
+        self.queue = []
+        self.inflight = {}
+        self.scheduled = False
+        self.tasks = set()  # running batch fetches; the loop only keeps weak references to tasks
+
+
+class UserLoader:
+    """Cached, coalescing front end for a batched user backend.
+
+    Lookups are served from a TTL + LRU cache; ids that miss are fetched with one
+    `fetch(ids)` call, and callers asking for an id that is already being fetched
+    wait for that fetch instead of starting another. The async API also gathers
+    ids requested in the same event-loop tick into a single backend call.
+
+    Sync and async lookups coalesce separately: asyncio futures belong to one
+    event loop, so each loop has its own in-flight map, apart from the one the
+    sync API shares across threads. A sync and an async caller asking for the
+    same missing id at once make two backend calls; the cache is shared.
+    """
+
+    def __init__(self, fetch=fetch_users_from_db, afetch=None, ttl=60.0, max_size=1024, clock=time.monotonic):
+        self.fetch = fetch
+        self.afetch = afetch or (lambda user_ids: asyncio.to_thread(fetch, user_ids))
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.loops = weakref.WeakKeyDictionary()
+        self.stats = {"hits": 0, "coalesced": 0, "backend_calls": 0, "ids_fetched": 0}
+
+    def get(self, user_id):
+        return self.get_many([user_id])[0]
+
+    def get_many(self, user_ids):
+        user_ids = list(user_ids)
+        results, waiting, mine = {}, {}, []
+        with self.lock:
+            for user_id in dict.fromkeys(user_ids):
+                user = self._cached(user_id)
+                if user is not _MISSING:
+                    results[user_id] = user
+                elif user_id in self.inflight:
+                    self.stats["coalesced"] += 1
+                    waiting[user_id] = self.inflight[user_id]
+                else:
+                    self.inflight[user_id] = Future()
+                    mine.append(user_id)
+
+        if mine:
+            try:
+                fetched = self._fetch(mine)
+            except BaseException as e:
+                with self.lock:
+                    for user_id in mine:
+                        self.inflight.pop(user_id).set_exception(e)
+                raise
+            with self.lock:
+                for user_id in mine:
+                    self._store(user_id, fetched.get(user_id))
+                    self.inflight.pop(user_id).set_result(fetched.get(user_id))
+            results.update((user_id, fetched.get(user_id)) for user_id in mine)
+
+        for user_id, future in waiting.items():
+            results[user_id] = future.result()
+        return [results[user_id] for user_id in user_ids]
+
+    async def aget(self, user_id):
+        return (await self.aget_many([user_id]))[0]
+
+    async def aget_many(self, user_ids):
+        user_ids = list(user_ids)
+        loop = asyncio.get_running_loop()
+        state = self.loops.setdefault(loop, _LoopState())
+        results, waiting = {}, {}
+        with self.lock:
+            for user_id in dict.fromkeys(user_ids):
+                user = self._cached(user_id)
+                if user is not _MISSING:
+                    results[user_id] = user
+                    continue
+                future = state.inflight.get(user_id)
+                if future is None:
+                    future = state.inflight[user_id] = loop.create_future()
+                    state.queue.append(user_id)
+                else:
+                    self.stats["coalesced"] += 1
+                waiting[user_id] = future
+        if state.queue and not state.scheduled:
+            state.scheduled = True
+            loop.call_soon(self._dispatch, state)
+
+        for user_id, future in waiting.items():
+            # shield: one caller being cancelled must not cancel the fetch other callers share
+            results[user_id] = await asyncio.shield(future)
+        return [results[user_id] for user_id in user_ids]
+
+    def _dispatch(self, state):
+        batch, state.queue, state.scheduled = state.queue, [], False
+        task = asyncio.ensure_future(self._afetch_batch(state, batch))
+        state.tasks.add(task)
+        task.add_done_callback(state.tasks.discard)
+
+    async def _afetch_batch(self, state, user_ids):
+        with self.lock:
+            self.stats["backend_calls"] += 1
+            self.stats["ids_fetched"] += len(user_ids)
+        try:
+            fetched = await self.afetch(user_ids)
+        except BaseException as e:
+            # waiters must not hang on a fetch that was cancelled or interrupted
+            for user_id in user_ids:
+                future = state.inflight.pop(user_id)
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            if isinstance(e, Exception):
+                return
+            raise
+        with self.lock:
+            for user_id in user_ids:
+                self._store(user_id, fetched.get(user_id))
+        for user_id in user_ids:
+            state.inflight.pop(user_id).set_result(fetched.get(user_id))
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def _fetch(self, user_ids):
+        with self.lock:
+            self.stats["backend_calls"] += 1
+            self.stats["ids_fetched"] += len(user_ids)
+        return self.fetch(user_ids)
+
+    def _cached(self, user_id):
+        # Caller holds self.lock.
+        entry = self.cache.get(user_id)
+        if entry is None:
+            return _MISSING
+        expires, user = entry
+        if expires <= self.clock():
+            del self.cache[user_id]
+            return _MISSING
+        self.cache.move_to_end(user_id)
+        self.stats["hits"] += 1
+        return user
+
+    def _store(self, user_id, user):
+        # Caller holds self.lock.
+        self.cache[user_id] = (self.clock() + self.ttl, user)
+        self.cache.move_to_end(user_id)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+
+user_loader = UserLoader()
+
+
+def get_users_from_db(user_ids):
+    return user_loader.get_many(user_ids)
+
+
+async def aget_user_from_db(user_id):
+    return await user_loader.aget(user_id)
+
+
+async def aget_users_from_db(user_ids):
+    return await user_loader.aget_many(user_ids)
@@ -0,0 +1,68 @@
+import numpy as np
+
+import source.shapes as shapes
+
+
+class CircleArray:
+    __slots__ = ("radius",)
+
+    def __init__(self, radius):
+        self.radius = np.asarray(radius, dtype=float)
+
+    @classmethod
+    def from_shapes(cls, circles):
+        return cls([c.radius for c in circles])
+
+    def __len__(self):
+        return len(self.radius)
+
+    def __getitem__(self, index):
+        return shapes.Circle(float(self.radius[index]))
+
+    def area(self):
+        return np.pi * self.radius**2
+
+    def perimeter(self):
+        return 2 * np.pi * self.radius
+
+
+class RectangleArray:
+    __slots__ = ("length", "width")
+
+    def __init__(self, length, width):
+        self.length = np.asarray(length, dtype=float)
+        self.width = np.asarray(width, dtype=float)
+        if self.length.shape != self.width.shape:
+            raise ValueError("length and width must have the same shape")
+
+    @classmethod
+    def from_shapes(cls, rectangles):
+        rectangles = list(rectangles)
+        return cls([r.length for r in rectangles], [r.width for r in rectangles])
+
+    def __len__(self):
+        return len(self.length)
+
+    def __getitem__(self, index):
+        return shapes.Rectangle(float(self.length[index]), float(self.width[index]))
+
+    def area(self):
+        return self.length * self.width
+
+    def perimeter(self):
+        return 2 * (self.length + self.width)
+
+
+class SquareArray(RectangleArray):
+    __slots__ = ()
+
+    def __init__(self, side_length):
+        side_length = np.asarray(side_length, dtype=float)
+        super().__init__(side_length, side_length)
+
+    @classmethod
+    def from_shapes(cls, squares):
+        return cls([s.length for s in squares])
+
+    def __getitem__(self, index):
+        return shapes.Square(float(self.length[index]))
@@ -2,6 +2,8 @@ import math
 
 
 class Shape:
+    __slots__ = ()
+
     def area(self):
         pass
 
@@ -10,6 +12,8 @@ class Shape:
 
 
 class Circle(Shape):
+    __slots__ = ("radius",)
+
     def __init__(self, radius: float):
         self.radius: float = radius
 
@@ -21,6 +25,8 @@ class Circle(Shape):
 
 
 class Rectangle(Shape):
+    __slots__ = ("length", "width")
+
     def __init__(self, length, width):
         self.length = length
         self.width = width
@@ -39,5 +45,7 @@ class Rectangle(Shape):
 
 
 class Square(Rectangle):
+    __slots__ = ()
+
     def __init__(self, side_length):
         super().__init__(side_length, side_length)
@@ -2,6 +2,10 @@ import pytest
 import source.shapes as shapes
 
 
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: takes seconds rather than milliseconds")
+
+
 @pytest.fixture
 def my_rectangle():
     return shapes.Rectangle(10, 20)
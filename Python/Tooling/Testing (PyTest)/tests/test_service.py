@@ -1,6 +1,9 @@
+import asyncio
+import time
 import pytest
 import source.service as service
 import unittest.mock as mock
+from concurrent.futures import ThreadPoolExecutor
 
 
 @mock.patch("source.service.get_user_from_db")
@@ -9,3 +12,121 @@ def test_get_user_from_db(mock_get_user_from_db):
     user_name = service.get_user_from_db(1)
 
     assert user_name == "Mocked Alice"
+
+
+class SlowBackend:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, user_ids):
+        self.calls.append(list(user_ids))
+        time.sleep(self.delay)
+        return {user_id: service.database.get(user_id) for user_id in user_ids}
+
+
+def test_get_users_from_db_matches_single_lookups():
+    assert service.get_users_from_db([3, 1, 42, 1]) == [
+        service.get_user_from_db(3), service.get_user_from_db(1), None, service.get_user_from_db(1)
+    ]
+
+
+def test_cache_serves_repeat_lookups():
+    backend = SlowBackend(delay=0)
+    loader = service.UserLoader(fetch=backend)
+
+    loader.get_many([1, 2])
+    assert loader.get_many([2, 1, 3]) == ["Bob", "Alice", "Charlie"]
+    assert backend.calls == [[1, 2], [3]]
+
+
+def test_cache_entries_expire():
+    now = [0.0]
+    backend = SlowBackend(delay=0)
+    loader = service.UserLoader(fetch=backend, ttl=10, clock=lambda: now[0])
+
+    loader.get(1)
+    now[0] = 5
+    loader.get(1)
+    now[0] = 11
+    loader.get(1)
+    assert backend.calls == [[1], [1]]
+
+
+def test_cache_evicts_least_recently_used():
+    backend = SlowBackend(delay=0)
+    loader = service.UserLoader(fetch=backend, max_size=2)
+
+    loader.get_many([1, 2])
+    loader.get(1)
+    loader.get(3)
+    loader.get_many([1, 2])
+    assert backend.calls == [[1, 2], [3], [2]]
+
+
+def test_backend_errors_reach_every_waiter():
+    def broken(user_ids):
+        time.sleep(0.05)
+        raise RuntimeError("database down")
+
+    loader = service.UserLoader(fetch=broken)
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(loader.get, 1) for _ in range(4)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+    assert loader.inflight == {}
+
+
+def test_concurrent_identical_lookups_share_one_fetch():
+    backend = SlowBackend(delay=0.2)
+    loader = service.UserLoader(fetch=backend)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(50) as pool:
+        users = list(pool.map(loader.get, [2] * 50))
+    elapsed = time.perf_counter() - start
+
+    assert users == ["Bob"] * 50
+    assert len(backend.calls) == 1
+    assert loader.stats["coalesced"] + loader.stats["hits"] == 49
+    assert elapsed < 50 * backend.delay / 5
+
+
+def test_async_lookups_in_one_tick_share_one_fetch():
+    backend = SlowBackend(delay=0.2)
+    loader = service.UserLoader(fetch=backend)
+
+    async def fan_in():
+        return await asyncio.gather(*(loader.aget(user_id % 3 + 1) for user_id in range(300)))
+
+    start = time.perf_counter()
+    users = asyncio.run(fan_in())
+    elapsed = time.perf_counter() - start
+
+    assert users == [service.get_user_from_db(user_id % 3 + 1) for user_id in range(300)]
+    assert backend.calls == [[1, 2, 3]]
+    assert elapsed < 300 * backend.delay / 50
+
+
+def test_async_waiters_see_a_cancelled_fetch():
+    async def cancelled(user_ids):
+        await asyncio.sleep(0.05)
+        raise asyncio.CancelledError()
+
+    loader = service.UserLoader(afetch=cancelled)
+
+    async def lookup():
+        results = await asyncio.gather(loader.aget(1), loader.aget(1), return_exceptions=True)
+        return results, loader.loops[asyncio.get_running_loop()]
+
+    results, state = asyncio.run(asyncio.wait_for(lookup(), 1))
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert state.inflight == {}
+    assert state.tasks == set()
+
+
+def test_async_api_uses_default_loader():
+    service.user_loader.clear()
+    assert asyncio.run(service.aget_users_from_db([1, 2])) == ["Alice", "Bob"]
+    assert asyncio.run(service.aget_user_from_db(3)) == "Charlie"
@@ -0,0 +1,49 @@
+import pytest
+import source.shapes as shapes
+
+np = pytest.importorskip("numpy")
+import source.shape_arrays as shape_arrays
+
+
+def test_circle_array_matches_circles():
+    radii = [1, 2.5, 10]
+    circles = shape_arrays.CircleArray(radii)
+
+    assert list(circles.area()) == [shapes.Circle(r).area() for r in radii]
+    assert list(circles.perimeter()) == [shapes.Circle(r).perimeter() for r in radii]
+
+
+def test_rectangle_array_matches_rectangles(my_rectangle, weird_rectangle):
+    rectangles = shape_arrays.RectangleArray.from_shapes([my_rectangle, weird_rectangle])
+
+    assert list(rectangles.area()) == [my_rectangle.area(), weird_rectangle.area()]
+    assert list(rectangles.perimeter()) == [my_rectangle.perimeter(), weird_rectangle.perimeter()]
+    assert rectangles[0] == my_rectangle
+
+
+@pytest.mark.parametrize("side_length, expected_area, expected_perimeter", [(5, 25, 20), (4, 16, 16)])
+def test_square_array(side_length, expected_area, expected_perimeter):
+    squares = shape_arrays.SquareArray([side_length])
+
+    assert squares.area()[0] == expected_area
+    assert squares.perimeter()[0] == expected_perimeter
+    assert squares[0] == shapes.Square(side_length)
+
+
+def test_rectangle_array_shape_mismatch():
+    with pytest.raises(ValueError):
+        shape_arrays.RectangleArray([1, 2], [3])
+
+
+def test_slots_block_new_attributes():
+    with pytest.raises(AttributeError):
+        shapes.Square(3).colour = "red"
+
+
+def test_rectangle_array_matches_many_rectangles():
+    # the timing comparison lives in benchmark_shapes.py
+    rng = np.random.default_rng(0)
+    lengths, widths = rng.random(1000), rng.random(1000)
+    objects = [shapes.Rectangle(l, w) for l, w in zip(lengths, widths)]
+
+    assert np.array_equal(shape_arrays.RectangleArray(lengths, widths).area(), [r.area() for r in objects])
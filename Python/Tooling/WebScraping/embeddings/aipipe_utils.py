@@ -2,17 +2,29 @@ import requests
 
 AIPIPE_EMBEDDING_URL = "https://aipipe.org/openai/v1/embeddings"
 AIPIPE_API_KEY = "your_actual_api_key"
+EMBEDDING_MODEL = "text-embedding-3-small"
+# longest input we send in one piece; pipeline.split_text chunks anything longer
+MAX_CHARS = 3000
 
-def get_embedding(text: str):
+session = requests.Session()
+
+
+def get_embeddings(texts):
     headers = {
         "Authorization": f"Bearer {AIPIPE_API_KEY}",
         "Content-Type": "application/json"
     }
     data = {
-        "input": text[:3000]
+        "model": EMBEDDING_MODEL,
+        "input": list(texts)
     }
 
-    res = requests.post(AIPIPE_EMBEDDING_URL, headers=headers, json=data)
+    res = session.post(AIPIPE_EMBEDDING_URL, headers=headers, json=data)
     res.raise_for_status()
 
-    return res.json()["embedding"]
\ No newline at end of file
+    rows = sorted(res.json()["data"], key=lambda row: row["index"])
+    return [row["embedding"] for row in rows]
+
+
+def get_embedding(text: str):
+    return get_embeddings([text])[0]
@@ -0,0 +1,70 @@
+"""Compare approximate index types against the exact flat index.
+
+Run from the project root after building a flat index:
+
+    python embeddings/build_index.py --index flat
+    python embeddings/benchmark_index.py --k 10 --queries 200
+"""
+import argparse, time
+import faiss
+import numpy as np
+from index_types import INDEX_TYPES, make_index
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--index-file", default="embeddings/index.faiss")
+parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+parser.add_argument("--k", type=int, default=10)
+parser.add_argument("--queries", type=int, default=200, help="held-out corpus vectors used as queries")
+parser.add_argument("--nlist", type=int)
+parser.add_argument("--nprobe", type=int, default=8)
+parser.add_argument("--pq-m", type=int, default=16)
+parser.add_argument("--pq-bits", type=int, default=8)
+parser.add_argument("--hnsw-m", type=int, default=32)
+parser.add_argument("--ef-search", type=int, default=64)
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+source = faiss.read_index(args.index_file)
+if not isinstance(source, faiss.IndexFlat):
+    raise SystemExit(f"{args.index_file} is not a flat index; rebuild it with --index flat")
+vecs = source.reconstruct_n(0, source.ntotal)
+
+# hold the queries out of the database so the nearest neighbour isn't trivially the query itself
+rng = np.random.default_rng(args.seed)
+n_queries = min(args.queries, len(vecs) // 10 or 1)
+order = rng.permutation(len(vecs))
+queries = np.ascontiguousarray(vecs[order[:n_queries]])
+base = np.ascontiguousarray(vecs[order[n_queries:]])
+k = min(args.k, len(base))
+
+truth = None
+print(f"{len(base)} vectors, dim {base.shape[1]}, {n_queries} queries, k={k}")
+print(f"{'index':<10}{'build s':>10}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}{'memory MB':>12}")
+
+for kind in ["flat"] + [t for t in args.types if t != "flat"]:
+    start = time.perf_counter()
+    try:
+        index = make_index(
+            base, kind, nlist=args.nlist, nprobe=args.nprobe, pq_m=args.pq_m,
+            pq_bits=args.pq_bits, hnsw_m=args.hnsw_m, ef_search=args.ef_search,
+            seed=args.seed,
+        )
+    except (ValueError, RuntimeError) as e:
+        print(f"{kind:<10}skipped: {e}")
+        continue
+    build_s = time.perf_counter() - start
+
+    latencies, found = [], []
+    for q in queries:
+        start = time.perf_counter()
+        _, ids = index.search(q[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(ids[0])
+    found = np.array(found)
+
+    if truth is None:
+        truth = found
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+    memory_mb = faiss.serialize_index(index).nbytes / 1e6
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{kind:<10}{build_s:>10.2f}{recall:>10.3f}{p50:>10.3f}{p99:>10.3f}{memory_mb:>12.2f}")
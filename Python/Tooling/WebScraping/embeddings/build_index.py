@@ -1,26 +1,52 @@
-import faiss, json
+import argparse, faiss, os
 import numpy as np
-from aipipe_utils import get_embedding
+from aipipe_utils import MAX_CHARS
+from index_types import INDEX_TYPES, make_index
+from metadata_store import MetadataWriter
+from pipeline import chunk_records, embed_batches, read_jsonl
 
-data_files = ["data/discourse_raw.json", "data/course_raw.json"]
+parser = argparse.ArgumentParser()
+parser.add_argument("--index", choices=INDEX_TYPES, default="flat")
+parser.add_argument("--nlist", type=int, help="IVF cells (default: 4*sqrt(n))")
+parser.add_argument("--nprobe", type=int, default=8)
+parser.add_argument("--pq-m", type=int, default=16)
+parser.add_argument("--pq-bits", type=int, default=8)
+parser.add_argument("--hnsw-m", type=int, default=32)
+parser.add_argument("--ef-search", type=int, default=64)
+parser.add_argument("--train-size", type=int, help="vectors sampled to train IVF (default: 64*nlist, at least 39*2**pq_bits for ivf_pq)")
+parser.add_argument("--batch-size", type=int, default=64, help="chunks per embedding request")
+parser.add_argument("--max-chars", type=int, default=MAX_CHARS, help="longest chunk sent for embedding")
+parser.add_argument("--overlap", type=int, default=200, help="characters shared by neighbouring chunks")
+args = parser.parse_args()
 
-texts, meta, vectors = [], [], []
+data_files = ["data/discourse_raw.jsonl", "data/course_raw.jsonl"]
+raw_vectors = "embeddings/vectors.f32"
 
-for file in data_files:
-    with open(file) as f:
-        items = json.load(f)
-        for item in items:
-            text = item["text"]
-            url = item["url"]
-            embedding = get_embedding(text)
-            vectors.append(embedding)
-            texts.append(text)
-            meta.append({"text": text, "source": url})
+# Stream chunks through the embedder, spilling vectors and metadata to disk batch by batch.
+chunks = chunk_records(read_jsonl(data_files), args.max_chars, args.overlap)
+dim = None
+with open(raw_vectors, "wb") as raw, MetadataWriter("data/metadata.jsonl") as store:
+    for records, vecs in embed_batches(chunks, args.batch_size):
+        vecs.tofile(raw)
+        dim = vecs.shape[1]
+        for r in records:
+            store.add({"text": r["text"], "source": r["url"], "chunk": r["chunk"]})
 
-vecs_np = np.array(vectors).astype("float32")
-index = faiss.IndexFlatL2(len(vecs_np[0]))
-index.add(vecs_np)
+if dim is None:
+    raise SystemExit("no records found in " + ", ".join(data_files))
+
+vecs_np = np.memmap(raw_vectors, dtype="float32", mode="r").reshape(-1, dim)
+index = make_index(
+    vecs_np, args.index, nlist=args.nlist, nprobe=args.nprobe, pq_m=args.pq_m,
+    pq_bits=args.pq_bits, hnsw_m=args.hnsw_m, ef_search=args.ef_search,
+    train_size=args.train_size,
+)
 faiss.write_index(index, "embeddings/index.faiss")
 
-with open("data/metadata.json", "w") as f:
-    json.dump(meta, f, indent=2)
+# raw vectors let retrieval.py search a flat index straight from a memory map
+out = np.lib.format.open_memmap("embeddings/vectors.npy", mode="w+", dtype="float32", shape=vecs_np.shape)
+for start in range(0, len(vecs_np), 65536):
+    out[start:start + 65536] = vecs_np[start:start + 65536]
+out.flush()
+del out, vecs_np
+os.remove(raw_vectors)
@@ -0,0 +1,62 @@
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+
+def default_nlist(n):
+    # faiss wants ~39+ training points per centroid; 4*sqrt(n) is the usual starting point
+    return max(1, min(int(4 * np.sqrt(n)), n // 39))
+
+
+def training_sample(vecs, size, seed=0):
+    if len(vecs) <= size:
+        return vecs
+    rng = np.random.default_rng(seed)
+    picked = np.sort(rng.choice(len(vecs), size, replace=False))
+    return np.ascontiguousarray(vecs[picked])
+
+
+def factory_string(kind, dim, n, nlist=None, pq_m=16, pq_bits=8, hnsw_m=32):
+    if kind == "flat":
+        return "Flat"
+    if kind == "hnsw":
+        return f"HNSW{hnsw_m}"
+    nlist = nlist or default_nlist(n)
+    if kind == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if kind == "ivf_pq":
+        if dim % pq_m:
+            raise ValueError(f"pq_m={pq_m} must divide the vector dimension {dim}")
+        return f"IVF{nlist},PQ{pq_m}x{pq_bits}"
+    raise ValueError(f"unknown index type {kind!r}, expected one of {INDEX_TYPES}")
+
+
+def make_index(vecs, kind="flat", nlist=None, nprobe=8, pq_m=16, pq_bits=8,
+               hnsw_m=32, ef_search=64, train_size=None, seed=0):
+    vecs = np.ascontiguousarray(vecs, dtype="float32")
+    n, dim = vecs.shape
+    index = faiss.index_factory(dim, factory_string(kind, dim, n, nlist, pq_m, pq_bits, hnsw_m))
+
+    if not index.is_trained:
+        ivf = faiss.extract_index_ivf(index)
+        if not train_size:
+            train_size = 64 * ivf.nlist
+            if kind == "ivf_pq":
+                # each PQ codebook has 2**pq_bits centroids, and wants ~39 points apiece too
+                train_size = max(train_size, 39 * (1 << pq_bits))
+            train_size = min(train_size, n)
+        index.train(training_sample(vecs, train_size, seed))
+
+    index.add(vecs)
+    set_search_params(index, nprobe=nprobe, ef_search=ef_search)
+    return index
+
+
+def set_search_params(index, nprobe=8, ef_search=64):
+    try:
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    except RuntimeError:
+        pass
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
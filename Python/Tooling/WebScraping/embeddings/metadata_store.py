@@ -0,0 +1,63 @@
+import json, mmap, os
+from array import array
+import numpy as np
+
+# Records live one per line in a JSON Lines file; a sidecar .offsets.npy holds the byte
+# offset of every line so a reader can mmap both and decode only the records it needs.
+
+
+def offsets_path(path):
+    return path.rsplit(".", 1)[0] + ".offsets.npy"
+
+
+class MetadataWriter:
+    # offsets are spilled to a raw uint64 file a block at a time, and only turned into the .npy at close,
+    # so memory stays flat however many records are written
+    BLOCK = 65536
+
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "wb")
+        self.spill_path = offsets_path(path) + ".tmp"
+        self.spill = open(self.spill_path, "wb")
+        self.offsets = array("Q", [0])
+
+    def add(self, record):
+        self.f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.offsets.append(self.f.tell())
+        if len(self.offsets) >= self.BLOCK:
+            self._flush_offsets()
+
+    def _flush_offsets(self):
+        self.offsets.tofile(self.spill)
+        del self.offsets[:]
+
+    def close(self):
+        self.f.close()
+        self._flush_offsets()
+        self.spill.close()
+        offsets = np.memmap(self.spill_path, dtype="uint64", mode="r")
+        np.save(offsets_path(self.path), offsets)
+        del offsets  # unmapped before the file is removed
+        os.remove(self.spill_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MetadataStore:
+    def __init__(self, path):
+        self.offsets = np.load(offsets_path(path), mmap_mode="r")
+        with open(path, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.offsets[-1] else b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return json.loads(self.buf[int(self.offsets[i]):int(self.offsets[i + 1])])
@@ -0,0 +1,60 @@
+"""Generator stages that take scraped JSON Lines records to embedding batches.
+
+Each stage pulls from the previous one, so only one batch of chunks and vectors is
+alive at a time regardless of how large the corpus is.
+"""
+import json
+from itertools import islice
+
+import numpy as np
+from aipipe_utils import MAX_CHARS, get_embeddings
+
+SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+
+def read_jsonl(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def split_text(text, max_chars=MAX_CHARS, overlap=200):
+    text = text.strip()
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            # cut at the coarsest boundary found in the back half of the window
+            for sep in SEPARATORS:
+                cut = text.rfind(sep, start + max_chars // 2, end)
+                if cut != -1:
+                    end = cut + len(sep)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
+        if end == len(text):
+            break
+        # step back by `overlap` chars, snapped forward to a word boundary
+        resume = text.find(" ", end - overlap, end)
+        start = resume + 1 if resume != -1 and resume + 1 > start else end
+
+
+def chunk_records(items, max_chars=MAX_CHARS, overlap=200):
+    for item in items:
+        for i, chunk in enumerate(split_text(item["text"], max_chars, overlap)):
+            yield {"text": chunk, "url": item["url"], "chunk": i}
+
+
+def batched(iterable, size):
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def embed_batches(records, batch_size=64):
+    for batch in batched(records, batch_size):
+        vecs = np.array(get_embeddings([r["text"] for r in batch]), dtype="float32")
+        yield batch, vecs
@@ -0,0 +1,72 @@
+"""Serve top-k lookups over the index written by build_index.py.
+
+Nothing is loaded into private memory up front: flat indexes are searched straight out of
+a memory-mapped vectors.npy, IVF indexes are opened with IO_FLAG_MMAP, and metadata is read
+from the mmapped metadata.jsonl. Worker processes that open the same files therefore share
+one copy in the page cache (HNSW graphs cannot be mmapped by faiss and are read normally).
+"""
+import queue, threading, time
+from concurrent.futures import Future
+
+import faiss
+import numpy as np
+from aipipe_utils import get_embedding
+from metadata_store import MetadataStore
+
+FLAT_FOURCCS = {b"IxF2", b"IxFI"}
+
+
+class Retriever:
+    def __init__(self, index_file="embeddings/index.faiss", vectors_file="embeddings/vectors.npy",
+                 metadata_file="data/metadata.jsonl", max_batch=64, max_wait_ms=2):
+        with open(index_file, "rb") as f:
+            fourcc = f.read(4)
+        if fourcc in FLAT_FOURCCS:
+            self.index = None
+            self.vectors = np.load(vectors_file, mmap_mode="r")
+            self.metric = faiss.METRIC_INNER_PRODUCT if fourcc == b"IxFI" else faiss.METRIC_L2
+        else:
+            self.index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        self.metadata = MetadataStore(metadata_file)
+
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.pending = queue.Queue()
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+
+    def search_vectors(self, vecs, k):
+        vecs = np.ascontiguousarray(vecs, dtype="float32")
+        if self.index is None:
+            return faiss.knn(vecs, self.vectors, k, metric=self.metric)
+        return self.index.search(vecs, k)
+
+    def submit(self, vector, k=5):
+        # Queue one query; concurrent callers are folded into a single search_vectors call.
+        future = Future()
+        self.pending.put((np.asarray(vector, dtype="float32"), k, future))
+        return future
+
+    def query(self, text, k=5):
+        _, ids = self.submit(get_embedding(text), k).result()
+        return [dict(self.metadata[i], id=int(i)) for i in ids if i >= 0]
+
+    def _batch_loop(self):
+        while True:
+            batch = [self.pending.get()]
+            # the first query waits at most max_wait in all, however many join it
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self.pending.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+
+            k = max(item[1] for item in batch)
+            try:
+                distances, ids = self.search_vectors(np.stack([item[0] for item in batch]), k)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            for row, (_, want, future) in enumerate(batch):
+                future.set_result((distances[row, :want], ids[row, :want]))
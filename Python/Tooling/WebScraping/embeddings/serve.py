@@ -0,0 +1,30 @@
+# Run from the project root; each worker maps the same index/metadata files:
+#   uvicorn serve:app --app-dir embeddings --workers 4
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from retrieval import Retriever
+
+retriever = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global retriever
+    retriever = await run_in_threadpool(Retriever)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class Query(BaseModel):
+    question: str
+    k: int = 5
+
+
+@app.post("/search")
+async def search(q: Query):
+    return {"results": await run_in_threadpool(retriever.query, q.question, q.k)}
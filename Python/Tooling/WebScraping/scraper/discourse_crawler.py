@@ -0,0 +1,129 @@
+"""Concurrent, resumable fetching of Discourse topic JSON.
+
+Point `base_url` at scraper/fake_discourse.py to exercise it without the real forum.
+"""
+import json, os, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class RateLimiter:
+    def __init__(self, per_second):
+        self.interval = 1 / per_second if per_second else 0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.topics = {}  # topic id -> Last-Modified of the copy we already have
+        self.run = None   # progress of an unfinished crawl
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.topics = state.get("topics", {})
+            self.run = state.get("run")
+        self.done = set(self.run["topics_done"]) if self.run else set()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"topics": self.topics, "run": self.run}, f)
+        os.replace(tmp, self.path)
+
+    def start(self):
+        self.run = {"pages_done": [], "topics_done": [], "output_offset": 0}
+        self.done = set()
+        self.save()
+
+    def page_done(self, page):
+        self.run["pages_done"].append(page)
+        self.save()
+
+    def topic_done(self, topic_id, last_modified, output_offset):
+        if last_modified:
+            self.topics[str(topic_id)] = last_modified
+        self.run["topics_done"].append(topic_id)
+        self.run["output_offset"] = output_offset
+        self.done.add(topic_id)
+        self.save()
+
+    def finish(self):
+        self.run = None
+        self.done = set()
+        self.save()
+
+
+class DiscourseCrawler:
+    def __init__(self, base_url, category_path, pages=5, workers=8, requests_per_second=5,
+                 retries=3, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.category_path = category_path.strip("/")
+        self.pages = pages
+        self.workers = workers
+        self.timeout = timeout
+        self.limiter = RateLimiter(requests_per_second)
+
+        retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=["GET"], respect_retry_after_header=True)
+        self.session = requests.Session()
+        self.session.mount(self.base_url, HTTPAdapter(pool_maxsize=workers, max_retries=retry))
+
+    def get(self, path, headers=None):
+        self.limiter.wait()
+        res = self.session.get(f"{self.base_url}/{path}", headers=headers, timeout=self.timeout)
+        res.raise_for_status()
+        return res
+
+    def list_topics(self, page):
+        data = self.get(f"{self.category_path}.json?page={page}").json()
+        return [t["id"] for t in data.get("topic_list", {}).get("topics", [])]
+
+    def fetch_topic(self, topic_id, last_modified=None):
+        # Returns (topic json or None if unchanged since last_modified, new Last-Modified).
+        headers = {"If-Modified-Since": last_modified} if last_modified else None
+        res = self.get(f"t/{topic_id}.json", headers)
+        if res.status_code == 304:
+            return None, last_modified
+        return res.json(), res.headers.get("Last-Modified")
+
+    def crawl(self, checkpoint, known_topics=()):
+        """Yield (topic_id, topic json or None, last_modified) for every topic not yet done.
+
+        Conditional requests are only sent for ids in `known_topics`, i.e. topics whose
+        previous posts the caller can still reuse when the server answers 304.
+        """
+        seen = set(checkpoint.done)
+        executor = ThreadPoolExecutor(self.workers)
+        try:
+            for page in range(self.pages):
+                if page in checkpoint.run["pages_done"]:
+                    continue
+                topic_ids = self.list_topics(page)
+                if not topic_ids:
+                    break
+                futures = {}
+                for topic_id in topic_ids:
+                    if topic_id in seen:
+                        continue
+                    seen.add(topic_id)
+                    since = checkpoint.topics.get(str(topic_id)) if topic_id in known_topics else None
+                    futures[executor.submit(self.fetch_topic, topic_id, since)] = topic_id
+                for future in as_completed(futures):
+                    data, last_modified = future.result()
+                    yield futures[future], data, last_modified
+                checkpoint.page_done(page)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
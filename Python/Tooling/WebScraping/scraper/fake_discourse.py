@@ -0,0 +1,92 @@
+"""Local stand-in for the Discourse JSON API, for exercising the crawler offline.
+
+    python scraper/fake_discourse.py --port 8000 --topics 120
+    python scraper/scrape_discourse.py --base-url http://127.0.0.1:8000
+"""
+import argparse, json, random, re, threading, time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PER_PAGE = 30
+
+
+def make_topics(count, posts_per_topic=5, modified=None):
+    modified = modified or time.time()
+    return {
+        topic_id: {
+            "modified": modified,
+            "posts": [
+                {"post_number": n, "cooked": f"<p>Topic {topic_id}, post {n}: <b>sample</b> text</p>"}
+                for n in range(1, posts_per_topic + 1)
+            ],
+        }
+        for topic_id in range(1, count + 1)
+    }
+
+
+class FakeDiscourse(ThreadingHTTPServer):
+    def __init__(self, address, topics, latency=0.0, failure_rate=0.0):
+        super().__init__(address, Handler)
+        self.topics = topics
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.hits = {"list": 0, "topic": 0, "not_modified": 0}
+        self.hits_lock = threading.Lock()
+
+    def hit(self, kind):
+        # requests are handled on concurrent threads
+        with self.hits_lock:
+            self.hits[kind] += 1
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        if random.random() < server.failure_rate:
+            return self.send_json(503, {"errors": ["try again"]})
+
+        page = re.fullmatch(r"/c/.+\.json\?page=(\d+)", self.path)
+        topic = re.fullmatch(r"/t/(\d+)\.json", self.path)
+        if page:
+            server.hit("list")
+            ids = sorted(server.topics)[int(page.group(1)) * PER_PAGE:][:PER_PAGE]
+            return self.send_json(200, {"topic_list": {"topics": [{"id": i} for i in ids]}})
+        if topic and int(topic.group(1)) in server.topics:
+            data = server.topics[int(topic.group(1))]
+            since = self.headers.get("If-Modified-Since")
+            if since and parsedate_to_datetime(since).timestamp() >= int(data["modified"]):
+                server.hit("not_modified")
+                return self.send_json(304, None)
+            server.hit("topic")
+            return self.send_json(200, {"post_stream": {"posts": data["posts"]}},
+                                  {"Last-Modified": formatdate(data["modified"], usegmt=True)})
+        self.send_json(404, {"errors": ["not found"]})
+
+    def send_json(self, status, payload, headers=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--topics", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    args = parser.parse_args()
+
+    server = FakeDiscourse(("127.0.0.1", args.port), make_topics(args.topics), args.latency, args.failure_rate)
+    print(f"serving {args.topics} topics on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,98 @@
+"""HTML-to-text for Discourse `cooked` post bodies without building a BeautifulSoup tree.
+
+`html_to_text(html)` returns exactly `BeautifulSoup(html, "html.parser").get_text()`.
+It drives bs4's own html.parser event handler (so entities, character references,
+CDATA and void elements are translated identically) into a sink that keeps only the
+text get_text() would return, instead of constructing Tag/NavigableString objects.
+"""
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup, CData
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+
+_Tag = namedtuple("_Tag", "name is_empty_element")
+
+
+class _TextSink:
+    # The subset of the BeautifulSoup tree-building interface BeautifulSoupHTMLParser calls.
+
+    def __init__(self):
+        self.builder = HTMLParserTreeBuilder()
+        self.contains_replacement_characters = False
+        self.original_encoding = None
+        self.pieces = []
+        self.current_data = []
+        self.tag_stack = []
+        self.open_tags = Counter()
+        self.preserving = 0  # open <pre>/<textarea>: whitespace-only strings kept verbatim
+        self.containers = 0  # open <script>/<style>/<template>/...: strings get_text() skips
+
+    def handle_starttag(self, name, namespace, nsprefix, attrs, sourceline=None, sourcepos=None,
+                        namespaces=None):
+        self.endData()
+        self.tag_stack.append(name)
+        self.open_tags[name] += 1
+        self.preserving += name in self.builder.preserve_whitespace_tags
+        self.containers += name in self.builder.string_containers
+        return _Tag(name, self.builder.can_be_empty_element(name))
+
+    def handle_endtag(self, name, nsprefix=None):
+        self.endData()
+        if not self.open_tags[name]:
+            return
+        while self.tag_stack:
+            popped = self.tag_stack.pop()
+            self.open_tags[popped] -= 1
+            self.preserving -= popped in self.builder.preserve_whitespace_tags
+            self.containers -= popped in self.builder.string_containers
+            if popped == name:
+                break
+
+    def handle_data(self, data):
+        self.current_data.append(data)
+
+    def endData(self, containerClass=None):
+        if not self.current_data:
+            return
+        data = "".join(self.current_data)
+        self.current_data = []
+        if not self.preserving and not data.strip(BeautifulSoup.ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        # get_text() keeps plain strings outside string-container tags, and CDATA anywhere
+        if containerClass is CData or (containerClass is None and not self.containers):
+            self.pieces.append(data)
+
+
+def html_to_text(html):
+    sink = _TextSink()
+    args, kwargs = sink.builder.parser_args
+    parser = BeautifulSoupHTMLParser(sink, *args, **kwargs)
+    parser.feed(html)
+    parser.close()
+    sink.endData()
+    return "".join(sink.pieces)
+
+
+class PostCleaner:
+    """Convert batches of post HTML to text, optionally across a process pool."""
+
+    def __init__(self, processes=0, chunksize=32):
+        self.pool = ProcessPoolExecutor(processes) if processes else None
+        self.chunksize = chunksize
+
+    def clean(self, htmls):
+        if self.pool is None:
+            return [html_to_text(h) for h in htmls]
+        return list(self.pool.map(html_to_text, htmls, chunksize=self.chunksize))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -13,5 +13,6 @@ def scrape():
         browser.close()
         return [{"text": t, "url": URL} for t in texts if len(t.strip()) > 50]
 
-with open("data/course_raw.json", "w") as f:
-    json.dump(scrape(), f, indent=2)
+with open("data/course_raw.jsonl", "w") as f:
+    for item in scrape():
+        f.write(json.dumps(item) + "\n")
@@ -1,26 +1,74 @@
-import requests, json
-from bs4 import BeautifulSoup
+import argparse, json, os, re
+from discourse_crawler import Checkpoint, DiscourseCrawler
+from html_text import PostCleaner
 
 BASE_URL = "https://discourse.onlinedegree.iitm.ac.in"
 CATEGORY_ID = 34
+OUTPUT = "data/discourse_raw.jsonl"
 
-def get_discourse_posts():
-    all_posts = []
-    for page in range(0, 5):
-        url = f"{BASE_URL}/c/courses/tds-kb/{CATEGORY_ID}.json?page={page}"
-        res = requests.get(url)
-        topics = res.json().get("topic_list", {}).get("topics", [])
-        for topic in topics:
-            topic_id = topic["id"]
-            topic_url = f"{BASE_URL}/t/{topic_id}.json"
-            topic_data = requests.get(topic_url).json()
-            for post in topic_data["post_stream"]["posts"]:
-                soup = BeautifulSoup(post["cooked"], "html.parser")
-                all_posts.append({
-                    "text": soup.get_text(),
-                    "url": f"{BASE_URL}/t/{topic_id}/{post['post_number']}"
-                })
-    return all_posts
-
-with open("data/discourse_raw.json", "w") as f:
-    json.dump(get_discourse_posts(), f, indent=2)
+def topic_posts(base_url, topic_id, topic_data, cleaner):
+    posts = topic_data["post_stream"]["posts"]
+    texts = cleaner.clean([post["cooked"] for post in posts])
+    for post, text in zip(posts, texts):
+        yield {
+            "text": text,
+            "url": f"{base_url}/t/{topic_id}/{post['post_number']}"
+        }
+
+def index_lines_by_topic(path):
+    # topic id -> byte ranges of its lines in a previous output, for reusing unchanged topics
+    ranges = {}
+    if not os.path.exists(path):
+        return ranges
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            # the topic is in the post's url; the text may link to other topics
+            m = re.search(r"/t/(\d+)/\d+$", json.loads(line)["url"])
+            if m:
+                ranges.setdefault(int(m.group(1)), []).append((offset, len(line)))
+            offset += len(line)
+    return ranges
+
+def scrape(crawler, checkpoint, output=OUTPUT, cleaner=None):
+    cleaner = cleaner or PostCleaner()
+    previous = output + ".prev"
+    if checkpoint.run is None:
+        if os.path.exists(output):
+            os.replace(output, previous)
+        checkpoint.start()
+    reusable = index_lines_by_topic(previous)
+
+    with open(output, "ab") as f, open(previous if reusable else os.devnull, "rb") as prev:
+        # drop anything written after the last checkpointed topic of an interrupted run
+        f.truncate(checkpoint.run["output_offset"])
+        for topic_id, topic_data, last_modified in crawler.crawl(checkpoint, reusable.keys()):
+            if topic_data is None:
+                for offset, length in reusable[topic_id]:
+                    prev.seek(offset)
+                    f.write(prev.read(length))
+            else:
+                for post in topic_posts(crawler.base_url, topic_id, topic_data, cleaner):
+                    f.write((json.dumps(post) + "\n").encode())
+            f.flush()
+            checkpoint.topic_done(topic_id, last_modified, f.tell())
+
+    checkpoint.finish()
+    if os.path.exists(previous):
+        os.remove(previous)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--category", default=f"c/courses/tds-kb/{CATEGORY_ID}")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=5, help="max requests per second")
+    parser.add_argument("--checkpoint", default="data/discourse_checkpoint.json")
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--parse-workers", type=int, default=0, help="processes for HTML-to-text (0: inline)")
+    args = parser.parse_args()
+
+    crawler = DiscourseCrawler(args.base_url, args.category, args.pages, args.workers, args.rps)
+    with PostCleaner(args.parse_workers) as cleaner:
+        scrape(crawler, Checkpoint(args.checkpoint), args.output, cleaner)
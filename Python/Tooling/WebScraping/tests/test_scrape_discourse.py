@@ -0,0 +1,62 @@
+import json, threading
+
+import pytest
+
+from discourse_crawler import Checkpoint, DiscourseCrawler
+from fake_discourse import FakeDiscourse, make_topics
+from scrape_discourse import index_lines_by_topic, scrape
+
+
+@pytest.fixture
+def server():
+    server = FakeDiscourse(("127.0.0.1", 0), make_topics(45))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run(server, tmp_path):
+    crawler = DiscourseCrawler(f"http://127.0.0.1:{server.server_port}", "c/test/1", pages=5,
+                               workers=4, requests_per_second=0)
+    output = str(tmp_path / "out.jsonl")
+    scrape(crawler, Checkpoint(str(tmp_path / "checkpoint.json")), output)
+    with open(output) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_crawl(server, tmp_path):
+    posts = run(server, tmp_path)
+    assert len(posts) == 45 * 5
+    assert {post["url"].rsplit("/t/", 1)[1] for post in posts} == {
+        f"{topic_id}/{n}" for topic_id in range(1, 46) for n in range(1, 6)}
+    assert "Topic 7, post 2: sample text" in {post["text"] for post in posts}
+    assert server.hits == {"list": 3, "topic": 45, "not_modified": 0}
+
+
+def test_recrawl_reuses_unchanged_topics(server, tmp_path):
+    first = run(server, tmp_path)
+    server.topics[3]["modified"] += 60
+    server.topics[3]["posts"][0]["cooked"] = "<p>edited</p>"
+    second = run(server, tmp_path)
+
+    assert server.hits["topic"] == 45 + 1
+    assert server.hits["not_modified"] == 44
+    changed = [post for post in first if post["url"].endswith("/t/3/1")][0]
+    assert sorted(map(json.dumps, second)) == sorted(
+        json.dumps({**post, "text": "edited"} if post is changed else post) for post in first)
+
+
+def test_index_lines_by_topic(tmp_path):
+    path = tmp_path / "out.jsonl"
+    posts = [{"text": "see /t/9/1", "url": "https://example.com/t/1/1"},
+             {"text": "reply", "url": "https://example.com/t/1/2"},
+             {"text": "other", "url": "https://example.com/t/2/1"}]
+    lines = [(json.dumps(post) + "\n").encode() for post in posts]
+    path.write_bytes(b"".join(lines))
+
+    assert index_lines_by_topic(str(path)) == {
+        1: [(0, len(lines[0])), (len(lines[0]), len(lines[1]))],
+        2: [(len(lines[0]) + len(lines[1]), len(lines[2]))],
+    }